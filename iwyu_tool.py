@@ -232,6 +232,9 @@ def slice_compilation_db(compilation_db, selection):
 
     return new_db
 
+# Used by execute() to yield between polls; tests swap it for a no-op.
+_poll_sleep = time.sleep
+
 def execute(invocations, verbose, formatter, jobs):
     """ Launch processes described by invocations. """
     if jobs == 1:
@@ -253,7 +256,7 @@ def execute(invocations, verbose, formatter, jobs):
         invocations = invocations[n:]
 
         # Yield CPU.
-        time.sleep(0.0001)
+        _poll_sleep(0.0001)
 
 
 def main(compilation_db_path, source_files, verbose, formatter, jobs,
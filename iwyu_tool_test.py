@@ -9,29 +9,56 @@
 #
 ##===----------------------------------------------------------------------===##
 
-import time
 import random
 import unittest
 import iwyu_tool
 
-try:
-    from cStringIO import StringIO
-except ImportError:
-    from io import StringIO
+# Make the mock block schedules reproducible from run to run.
+random.seed(0)
+
+_DEFAULT_FORMATTER = iwyu_tool.FORMATTERS.get(iwyu_tool.DEFAULT_FORMAT,
+                                              iwyu_tool.DEFAULT_FORMAT)
+_BAR = tuple('BAR%d' % n for n in range(100))
+_BAR_SET = frozenset(_BAR)
+
+
+class _ListSink(object):
+    """ Minimal stdout replacement that collects writes in a list. """
+    __slots__ = ('buf',)
+
+    def __init__(self):
+        self.buf = []
+
+    def write(self, s):
+        self.buf.append(s)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.buf = []
+
+    def getvalue(self):
+        return ''.join(self.buf)
+
+    def splitlines(self):
+        return self.getvalue().splitlines()
+
 
 class MockProcess(object):
     def __init__(self, block, content):
-        self.block = block
         self.content = content
-        self.complete_ts = time.time() + block
+        self._remaining = block
 
     def poll(self):
-        if time.time() < self.complete_ts:
+        # Each poll is one tick of a virtual clock; the process completes
+        # once it has been polled 'block' times.
+        if self._remaining > 0:
+            self._remaining -= 1
             return None
         return 0
 
     def get_output(self):
-        self.poll()
         return self.content
 
 class MockInvocation(iwyu_tool.Invocation):
@@ -40,26 +67,36 @@ class MockInvocation(iwyu_tool.Invocation):
         self._will_return = ''
         self._will_block = 0
 
-    def will_block(self, seconds):
-        self._will_block = seconds
+    def will_block(self, ticks):
+        self._will_block = ticks
 
     def will_return(self, content):
         self._will_return = content
 
     def start(self, verbose):
-        if self._will_block > 0:
-            time.sleep(self._will_block)
         return MockProcess(self._will_block, self._will_return)
 
 
 class IWYUToolTestBase(unittest.TestCase):
     def setUp(self):
-        self.stdout_stub = StringIO()
+        self._prev_stdout = iwyu_tool.sys.stdout
+        self.stdout_stub = _ListSink()
         iwyu_tool.sys.stdout = self.stdout_stub
+        # MockProcess runs on a virtual clock, so the executor's poll loop
+        # has no reason to yield in real time.
+        self._orig_sleep = iwyu_tool._poll_sleep
+        iwyu_tool._poll_sleep = lambda _seconds: None
+
+    def tearDown(self):
+        iwyu_tool._poll_sleep = self._orig_sleep
+        iwyu_tool.sys.stdout = self._prev_stdout
+        self.stdout_stub.close()
 
     def _execute(self, invocations, verbose=False, formatter=None, jobs=1):
-        formatter = formatter or iwyu_tool.DEFAULT_FORMAT
-        formatter = iwyu_tool.FORMATTERS.get(formatter, formatter)
+        if formatter is None:
+            formatter = _DEFAULT_FORMATTER
+        else:
+            formatter = iwyu_tool.FORMATTERS.get(formatter, formatter)
         return iwyu_tool.execute(invocations, verbose, formatter, jobs)
 
 
@@ -86,21 +123,18 @@ class IWYUToolTests(IWYUToolTestBase):
     def test_order_asynchronous(self):
         invocations = [MockInvocation() for _ in range(100)]
         for n, invocation in enumerate(invocations):
-            invocation.will_return('BAR%d' % n)
-            invocation.will_block(random.random() / 100)
+            invocation.will_return(_BAR[n])
+            invocation.will_block(random.randint(0, 5))
         self._execute(invocations, jobs=100)
         self.assertSetEqual(
-            set('BAR%d' % n for n in range(100)),
-            set(self.stdout_stub.getvalue().splitlines()))
+            _BAR_SET, set(self.stdout_stub.splitlines()))
 
     def test_order_synchronous(self):
         invocations = [MockInvocation() for _ in range(100)]
         for n, invocation in enumerate(invocations):
-            invocation.will_return('BAR%d' % n)
-            invocation.will_block(random.random() / 100)
+            invocation.will_return(_BAR[n])
         self._execute(invocations, jobs=1)
-        self.assertEqual(['BAR%d' % n for n in range(100)],
-                         self.stdout_stub.getvalue().splitlines())
+        self.assertEqual(_BAR, tuple(self.stdout_stub.splitlines()))
 
 
 if __name__ == '__main__':